@@ -0,0 +1,37 @@
+# Ahead-of-time build of the indicator kernels into a native `tafast_f4` module next to this file:
+#
+#     python build_ext.py
+#
+# indicators.py wraps the tafast_f4 versions when the module is importable, so the dashboards
+# skip JIT compilation on first page load. Without the build they keep using the @njit kernels.
+import os
+import sys
+
+import numba
+
+# numba.pycc is pending deprecation; fail loudly so the caller knows the dashboards will JIT instead
+try:
+    from numba.pycc import CC
+except ImportError:
+    sys.exit(f"numba {numba.__version__} has no numba.pycc; skipping the AOT build, indicators will JIT-compile")
+
+sys.modules["tafast_f4"] = None  # compile from the JIT definitions even if an older build is on disk
+import indicators
+
+cc = CC("tafast_f4")
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+cc.export("emas_macd", "Tuple((f4[:], f4[:], f4[:], f4[:]))(f4[:])")(indicators.emas_macd.py_func)
+cc.export("rsi14", "f4[:](f4[:])")(indicators.rsi14.py_func)
+cc.export("vwap", "f4[:](f4[:], f4[:], f4[:], f4[:])")(indicators.vwap.py_func)
+cc.export("sma", "f4[:](f4[:], i8)")(indicators.sma.py_func)
+
+
+def float_bits():
+    # Checked by indicators.py before it trusts the exports above
+    return 32
+
+
+cc.export("float_bits", "i8()")(float_bits)
+
+if __name__ == "__main__":
+    cc.compile()
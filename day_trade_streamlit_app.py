@@ -1,11 +1,9 @@
 
 import streamlit as st
-import yfinance as yf
-import pandas as pd
-import numpy as np
 import plotly.graph_objects as go
-from ta.momentum import RSIIndicator
-from ta.trend import EMAIndicator, MACD
+from indicators import label_rsi_signals
+from market_data import CACHE_TTL, current_refresh_key, load_ohlcv
+from plotting import to_plot
 import plotly.express as px
 
 st.set_page_config(layout="wide")
@@ -17,29 +15,14 @@ interval = st.sidebar.selectbox("Interval", ["5m", "15m", "30m", "1h", "1d"], in
 period = st.sidebar.selectbox("Data Period", ["1d", "5d", "7d", "1mo"], index=1)
 
 # --- Fetch Data ---
-df = yf.download(ticker, interval=interval, period=period)
-
-# ✅ FLATTEN MULTI-LEVEL COLUMNS IF PRESENT
-if isinstance(df.columns, pd.MultiIndex):
-    df.columns = df.columns.get_level_values(0)
-
-df.dropna(inplace=True)
-close = df["Close"]
-
-# --- Indicators ---
-df["RSI"] = RSIIndicator(close=close).rsi()
-df["EMA9"] = EMAIndicator(close=close, window=9).ema_indicator()
-df["EMA21"] = EMAIndicator(close=close, window=21).ema_indicator()
-macd = MACD(close=close)
-df["MACD"] = macd.macd()
-df["MACD_Signal"] = macd.macd_signal()
-
-df.dropna(inplace=True)
+refresh_key = current_refresh_key(interval)
+df = load_ohlcv(ticker, interval, period, refresh_key, rsi=True).dropna()
 
 # --- Buy/Sell Signal Logic ---
-df["Signal"] = ""
-df.loc[(df["RSI"] < 30) & (df["MACD"] > df["MACD_Signal"]) & (df["EMA9"] > df["EMA21"]), "Signal"] = "BUY"
-df.loc[(df["RSI"] > 70) & (df["MACD"] < df["MACD_Signal"]) & (df["EMA9"] < df["EMA21"]), "Signal"] = "SELL"
+SIGNAL_LABELS = {1: "BUY", -1: "SELL", 0: ""}  # display labels by signal code
+signal_codes = label_rsi_signals(df["RSI"].to_numpy(), df["MACD"].to_numpy(), df["MACD_Signal"].to_numpy(),
+                                 df["EMA9"].to_numpy(), df["EMA21"].to_numpy())
+df["Signal"] = signal_codes
 
 # --- Display Latest Signal ---
 latest = df.iloc[-1]
@@ -48,35 +31,49 @@ st.write(f"**RSI:** {latest['RSI']:.2f}")
 st.write(f"**MACD:** {latest['MACD']:.2f}")
 st.write(f"**EMA9:** {latest['EMA9']:.2f}")
 st.write(f"**EMA21:** {latest['EMA21']:.2f}")
-st.write(f"**Signal:** {'🟢 ' + latest['Signal'] if latest['Signal'] else 'No strong signal'}")
+signal_label = SIGNAL_LABELS[df["Signal"].iloc[-1]]
+st.write(f"**Signal:** {'🟢 ' + signal_label if signal_label else 'No strong signal'}")
 
-# --- Candlestick + Signal Chart ---
-fig = go.Figure()
-fig.add_trace(go.Candlestick(x=df.index, open=df["Open"], high=df["High"],
-                             low=df["Low"], close=df["Close"], name="Price"))
-fig.add_trace(go.Scatter(x=df.index, y=df["EMA9"], name="EMA9"))
-fig.add_trace(go.Scatter(x=df.index, y=df["EMA21"], name="EMA21"))
+# --- Charts ---
+@st.cache_resource(ttl=max(CACHE_TTL.values()), show_spinner=False)
+def build_charts(_data, ticker, interval, period, refresh_key):
+    plot_df = to_plot(_data)
 
-fig.add_trace(go.Scatter(x=df[df["Signal"] == "BUY"].index,
-                         y=df[df["Signal"] == "BUY"]["Close"],
-                         mode="markers", marker=dict(color="green", size=8),
-                         name="BUY"))
-fig.add_trace(go.Scatter(x=df[df["Signal"] == "SELL"].index,
-                         y=df[df["Signal"] == "SELL"]["Close"],
-                         mode="markers", marker=dict(color="red", size=8),
-                         name="SELL"))
+    # BUY/SELL markers stay at full resolution; filter once and reuse for x and y
+    buy_mask = _data["Signal"].to_numpy() == 1
+    sell_mask = _data["Signal"].to_numpy() == -1
+    close_values = _data["Close"].to_numpy()
 
-fig.update_layout(title=f"{ticker} Price + Signals", xaxis_title="Time", yaxis_title="Price", height=600)
-st.plotly_chart(fig, use_container_width=True)
+    # --- Candlestick + Signal Chart ---
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(x=plot_df.index, open=plot_df["Open"], high=plot_df["High"],
+                                 low=plot_df["Low"], close=plot_df["Close"], name="Price"))
+    fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["EMA9"], name="EMA9"))
+    fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["EMA21"], name="EMA21"))
 
-# --- RSI Chart ---
-fig_rsi = px.line(df, x=df.index, y="RSI", title=f"{ticker} RSI")
-fig_rsi.update_traces(line_color="orange")
-st.plotly_chart(fig_rsi, use_container_width=True)
+    fig.add_trace(go.Scatter(x=_data.index[buy_mask],
+                             y=close_values[buy_mask],
+                             mode="markers", marker=dict(color="green", size=8),
+                             name="BUY"))
+    fig.add_trace(go.Scatter(x=_data.index[sell_mask],
+                             y=close_values[sell_mask],
+                             mode="markers", marker=dict(color="red", size=8),
+                             name="SELL"))
 
-# --- MACD Chart ---
-fig_macd = go.Figure()
-fig_macd.add_trace(go.Scatter(x=df.index, y=df["MACD"], name="MACD", line=dict(color="blue")))
-fig_macd.add_trace(go.Scatter(x=df.index, y=df["MACD_Signal"], name="MACD Signal", line=dict(color="red")))
-fig_macd.update_layout(title=f"{ticker} MACD", xaxis_title="Time", yaxis_title="MACD", height=400)
+    fig.update_layout(title=f"{ticker} Price + Signals", xaxis_title="Time", yaxis_title="Price", height=600)
+
+    # --- RSI Chart ---
+    fig_rsi = px.line(plot_df, x=plot_df.index, y="RSI", title=f"{ticker} RSI")
+    fig_rsi.update_traces(line_color="orange")
+
+    # --- MACD Chart ---
+    fig_macd = go.Figure()
+    fig_macd.add_trace(go.Scatter(x=plot_df.index, y=plot_df["MACD"], name="MACD", line=dict(color="blue")))
+    fig_macd.add_trace(go.Scatter(x=plot_df.index, y=plot_df["MACD_Signal"], name="MACD Signal", line=dict(color="red")))
+    fig_macd.update_layout(title=f"{ticker} MACD", xaxis_title="Time", yaxis_title="MACD", height=400)
+    return fig, fig_rsi, fig_macd
+
+fig, fig_rsi, fig_macd = build_charts(df, ticker, interval, period, refresh_key)
+st.plotly_chart(fig, use_container_width=True)
+st.plotly_chart(fig_rsi, use_container_width=True)
 st.plotly_chart(fig_macd, use_container_width=True)
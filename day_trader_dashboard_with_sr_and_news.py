@@ -1,10 +1,10 @@
 
 import streamlit as st
-import yfinance as yf
-import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from ta.trend import EMAIndicator, MACD
+from indicators import label_vwap_signals
+from market_data import CACHE_TTL, current_refresh_key, load_ohlcv
+from plotting import to_plot
 import requests
 
 st.set_page_config(layout="wide")
@@ -16,75 +16,59 @@ interval = st.sidebar.selectbox("Interval", ["1m", "5m", "15m", "30m", "1h"], in
 period = st.sidebar.selectbox("Data Period", ["1d", "5d", "7d"], index=1)
 
 # --- Fetch Data ---
-df = yf.download(ticker, interval=interval, period=period)
-
-# Flatten columns if needed
-if isinstance(df.columns, pd.MultiIndex):
-    df.columns = df.columns.get_level_values(0)
-
-df.dropna(inplace=True)
-close = df["Close"]
-
-# --- Indicators ---
-df["EMA9"] = EMAIndicator(close=close, window=9).ema_indicator()
-df["EMA21"] = EMAIndicator(close=close, window=21).ema_indicator()
-macd_calc = MACD(close=close)
-df["MACD"] = macd_calc.macd()
-df["MACD_Signal"] = macd_calc.macd_signal()
-df["VWAP"] = (df["Volume"] * (df["High"] + df["Low"] + df["Close"]) / 3).cumsum() / df["Volume"].cumsum()
-df["Volume_SMA20"] = df["Volume"].rolling(window=20).mean()
-df["Volume_Spike"] = df["Volume"] > (1.5 * df["Volume_SMA20"])
+refresh_key = current_refresh_key(interval)
+df = load_ohlcv(ticker, interval, period, refresh_key)
 
 # --- Support & Resistance ---
-def detect_levels(data, sensitivity=3):
+@st.cache_data(ttl=max(CACHE_TTL.values()), show_spinner=False)
+def detect_levels(_data, ticker, interval, period, refresh_key, sensitivity=3):
+    low = _data["Low"]
+    high = _data["High"]
+    # Window ending the bar before i is the left side; the one ending `sensitivity` bars after i is the right side
+    low_min = low.rolling(sensitivity).min()
+    high_max = high.rolling(sensitivity).max()
+    is_support = ((low < low_min.shift(1)) & (low < low_min.shift(-sensitivity))).to_numpy()
+    is_resistance = ((high > high_max.shift(1)) & (high > high_max.shift(-sensitivity))).to_numpy()
+    low = low.to_numpy()
+    high = high.to_numpy()
     levels = []
-    for i in range(sensitivity, len(data) - sensitivity):
-        if data["Low"][i] < data["Low"][i - sensitivity:i].min() and data["Low"][i] < data["Low"][i + 1:i + sensitivity + 1].min():
-            levels.append(("support", data.index[i], data["Low"][i]))
-        if data["High"][i] > data["High"][i - sensitivity:i].max() and data["High"][i] > data["High"][i + 1:i + sensitivity + 1].max():
-            levels.append(("resistance", data.index[i], data["High"][i]))
+    for i in np.flatnonzero(is_support | is_resistance):
+        if is_support[i]:
+            levels.append(("support", _data.index[i], low[i]))
+        if is_resistance[i]:
+            levels.append(("resistance", _data.index[i], high[i]))
     return levels
 
-levels = detect_levels(df)
+levels = detect_levels(df, ticker, interval, period, refresh_key)
 
 # --- Signal Logic with Support/Resistance Filter ---
-df.dropna(inplace=True)
-df["Signal"] = ""
+df = df.dropna()
 
-support_levels = [price for kind, _, price in levels if kind == "support"]
-resistance_levels = [price for kind, _, price in levels if kind == "resistance"]
+support_levels = np.fromiter((price for kind, _, price in levels if kind == "support"), dtype=np.float64)
+resistance_levels = np.fromiter((price for kind, _, price in levels if kind == "resistance"), dtype=np.float64)
 
 last_price = df["Close"].iloc[-1]
-near_support = any(abs(last_price - lvl) / last_price < 0.01 for lvl in support_levels)
-near_resistance = any(abs(last_price - lvl) / last_price < 0.01 for lvl in resistance_levels)
-
-buy_condition = (
-    (df["MACD"] > df["MACD_Signal"]) &
-    (df["EMA9"] > df["EMA21"]) &
-    (df["Close"] > df["VWAP"]) &
-    (df["Volume_Spike"]) &
-    near_support
-)
-
-sell_condition = (
-    (df["MACD"] < df["MACD_Signal"]) &
-    (df["EMA9"] < df["EMA21"]) &
-    (df["Close"] < df["VWAP"]) &
-    (df["Volume_Spike"]) &
-    near_resistance
-)
-
-df.loc[buy_condition, "Signal"] = "BUY"
-df.loc[sell_condition, "Signal"] = "SELL"
+near_support = bool((np.abs(support_levels - last_price) < 0.01 * last_price).any())
+near_resistance = bool((np.abs(resistance_levels - last_price) < 0.01 * last_price).any())
+
+SIGNAL_LABELS = {1: "BUY", -1: "SELL", 0: ""}  # display labels by signal code
+signal_codes = label_vwap_signals(df["Close"].to_numpy(), df["VWAP"].to_numpy(), df["MACD"].to_numpy(),
+                                  df["MACD_Signal"].to_numpy(), df["EMA9"].to_numpy(), df["EMA21"].to_numpy(),
+                                  df["Volume_Spike"].to_numpy(), near_support, near_resistance)
+df["Signal"] = signal_codes
 
 # --- News Headlines (via Yahoo Finance RSS) ---
-st.sidebar.markdown("### 📰 Latest News")
-news_url = f"https://feeds.finance.yahoo.com/rss/2.0/headline?s={ticker}&region=US&lang=en-US"
-try:
+@st.cache_data(ttl=300, show_spinner=False)
+def get_news(ticker):
     import feedparser
+    news_url = f"https://feeds.finance.yahoo.com/rss/2.0/headline?s={ticker}&region=US&lang=en-US"
     feed = feedparser.parse(news_url)
-    for entry in feed.entries[:5]:
-        st.sidebar.write(f"• [{entry.title}]({entry.link})")
+    return [(entry.title, entry.link) for entry in feed.entries[:5]]
+
+st.sidebar.markdown("### 📰 Latest News")
+try:
+    for title, link in get_news(ticker):
+        st.sidebar.write(f"• [{title}]({link})")
 except:
     st.sidebar.warning("Unable to fetch news.")
 
@@ -96,37 +80,53 @@ st.write(f"**EMA9:** {latest['EMA9']:.2f} | EMA21: {latest['EMA21']:.2f}")
 st.write(f"**VWAP:** {latest['VWAP']:.2f}")
 st.write(f"**Volume:** {int(latest['Volume'])} | Avg Volume: {int(latest['Volume_SMA20'])}")
 st.write(f"**Near Support:** {near_support} | Near Resistance: {near_resistance}")
-st.write(f"**Signal:** {'🟢 ' + latest['Signal'] if latest['Signal'] else 'No strong signal'}")
-
-# --- Plot Chart ---
-fig = go.Figure()
-fig.add_trace(go.Candlestick(x=df.index, open=df["Open"], high=df["High"],
-                             low=df["Low"], close=df["Close"], name="Price"))
-fig.add_trace(go.Scatter(x=df.index, y=df["EMA9"], name="EMA9", line=dict(width=1)))
-fig.add_trace(go.Scatter(x=df.index, y=df["EMA21"], name="EMA21", line=dict(width=1)))
-fig.add_trace(go.Scatter(x=df.index, y=df["VWAP"], name="VWAP", line=dict(width=1, dash="dot")))
-
-for level_type, x, price in levels:
-    fig.add_shape(type="line", x0=df.index[0], x1=df.index[-1], y0=price, y1=price,
-                  line=dict(dash="dot", color="blue" if level_type == "support" else "red"),
-                  name=level_type)
-
-fig.add_trace(go.Scatter(x=df[df["Signal"] == "BUY"].index,
-                         y=df[df["Signal"] == "BUY"]["Close"],
-                         mode="markers", marker=dict(color="green", size=8),
-                         name="BUY"))
-
-fig.add_trace(go.Scatter(x=df[df["Signal"] == "SELL"].index,
-                         y=df[df["Signal"] == "SELL"]["Close"],
-                         mode="markers", marker=dict(color="red", size=8),
-                         name="SELL"))
-
-fig.update_layout(title=f"{ticker} Price + Signals + S/R Levels", xaxis_title="Time", yaxis_title="Price", height=600)
+signal_label = SIGNAL_LABELS[df["Signal"].iloc[-1]]
+st.write(f"**Signal:** {'🟢 ' + signal_label if signal_label else 'No strong signal'}")
+
+# --- Charts ---
+@st.cache_resource(ttl=max(CACHE_TTL.values()), show_spinner=False)
+def build_charts(_data, _levels, ticker, interval, period, refresh_key):
+    plot_df = to_plot(_data)
+
+    # BUY/SELL markers stay at full resolution; filter once and reuse for x and y
+    buy_mask = _data["Signal"].to_numpy() == 1
+    sell_mask = _data["Signal"].to_numpy() == -1
+    close_values = _data["Close"].to_numpy()
+
+    # --- Plot Chart ---
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(x=plot_df.index, open=plot_df["Open"], high=plot_df["High"],
+                                 low=plot_df["Low"], close=plot_df["Close"], name="Price"))
+    fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["EMA9"], name="EMA9", line=dict(width=1)))
+    fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["EMA21"], name="EMA21", line=dict(width=1)))
+    fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["VWAP"], name="VWAP", line=dict(width=1, dash="dot")))
+
+    fig.update_layout(shapes=[
+        dict(type="line", xref="x", yref="y", x0=_data.index[0], x1=_data.index[-1], y0=price, y1=price,
+             line=dict(dash="dot", color="blue" if level_type == "support" else "red"),
+             name=level_type)
+        for level_type, x, price in _levels
+    ])
+
+    fig.add_trace(go.Scatter(x=_data.index[buy_mask],
+                             y=close_values[buy_mask],
+                             mode="markers", marker=dict(color="green", size=8),
+                             name="BUY"))
+
+    fig.add_trace(go.Scatter(x=_data.index[sell_mask],
+                             y=close_values[sell_mask],
+                             mode="markers", marker=dict(color="red", size=8),
+                             name="SELL"))
+
+    fig.update_layout(title=f"{ticker} Price + Signals + S/R Levels", xaxis_title="Time", yaxis_title="Price", height=600)
+
+    # --- Volume Chart ---
+    vol_fig = go.Figure()
+    vol_fig.add_trace(go.Bar(x=plot_df.index, y=plot_df["Volume"], name="Volume"))
+    vol_fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["Volume_SMA20"], name="Avg Volume", line=dict(color="orange")))
+    vol_fig.update_layout(title=f"{ticker} Volume with Spikes", height=300)
+    return fig, vol_fig
+
+fig, vol_fig = build_charts(df, levels, ticker, interval, period, refresh_key)
 st.plotly_chart(fig, use_container_width=True)
-
-# --- Volume Chart ---
-vol_fig = go.Figure()
-vol_fig.add_trace(go.Bar(x=df.index, y=df["Volume"], name="Volume"))
-vol_fig.add_trace(go.Scatter(x=df.index, y=df["Volume_SMA20"], name="Avg Volume", line=dict(color="orange")))
-vol_fig.update_layout(title=f"{ticker} Volume with Spikes", height=300)
 st.plotly_chart(vol_fig, use_container_width=True)
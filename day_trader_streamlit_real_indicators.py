@@ -1,10 +1,9 @@
 
 import streamlit as st
-import yfinance as yf
-import pandas as pd
-import numpy as np
 import plotly.graph_objects as go
-from ta.trend import EMAIndicator, MACD
+from indicators import label_vwap_signals
+from market_data import CACHE_TTL, current_refresh_key, load_ohlcv
+from plotting import to_plot
 
 st.set_page_config(layout="wide")
 st.title("🚀 Real Day Trading Signal Dashboard (MACD, EMA, VWAP, Volume)")
@@ -15,47 +14,15 @@ interval = st.sidebar.selectbox("Interval", ["1m", "5m", "15m", "30m", "1h"], in
 period = st.sidebar.selectbox("Data Period", ["1d", "5d", "7d"], index=1)
 
 # Fetch data
-df = yf.download(ticker, interval=interval, period=period)
-
-# Flatten columns if needed
-if isinstance(df.columns, pd.MultiIndex):
-    df.columns = df.columns.get_level_values(0)
-
-df.dropna(inplace=True)
-close = df["Close"]
-
-# Calculate indicators
-df["EMA9"] = EMAIndicator(close=close, window=9).ema_indicator()
-df["EMA21"] = EMAIndicator(close=close, window=21).ema_indicator()
-macd_calc = MACD(close=close)
-df["MACD"] = macd_calc.macd()
-df["MACD_Signal"] = macd_calc.macd_signal()
-
-# VWAP calculation
-df["VWAP"] = (df["Volume"] * (df["High"] + df["Low"] + df["Close"]) / 3).cumsum() / df["Volume"].cumsum()
-
-# Volume spike detection
-df["Volume_SMA20"] = df["Volume"].rolling(window=20).mean()
-df["Volume_Spike"] = df["Volume"] > (1.5 * df["Volume_SMA20"])
+refresh_key = current_refresh_key(interval)
+df = load_ohlcv(ticker, interval, period, refresh_key).dropna()
 
 # Signal logic
-df.dropna(inplace=True)
-df["Signal"] = ""
-df.loc[
-    (df["MACD"] > df["MACD_Signal"]) &
-    (df["EMA9"] > df["EMA21"]) &
-    (df["Close"] > df["VWAP"]) &
-    (df["Volume_Spike"]),
-    "Signal"
-] = "BUY"
-
-df.loc[
-    (df["MACD"] < df["MACD_Signal"]) &
-    (df["EMA9"] < df["EMA21"]) &
-    (df["Close"] < df["VWAP"]) &
-    (df["Volume_Spike"]),
-    "Signal"
-] = "SELL"
+SIGNAL_LABELS = {1: "BUY", -1: "SELL", 0: ""}  # display labels by signal code
+signal_codes = label_vwap_signals(df["Close"].to_numpy(), df["VWAP"].to_numpy(), df["MACD"].to_numpy(),
+                                  df["MACD_Signal"].to_numpy(), df["EMA9"].to_numpy(), df["EMA21"].to_numpy(),
+                                  df["Volume_Spike"].to_numpy(), True, True)
+df["Signal"] = signal_codes
 
 # Display latest signal
 latest = df.iloc[-1]
@@ -64,32 +31,46 @@ st.write(f"**MACD:** {latest['MACD']:.2f} | **MACD Signal:** {latest['MACD_Signa
 st.write(f"**EMA9:** {latest['EMA9']:.2f} | **EMA21:** {latest['EMA21']:.2f}")
 st.write(f"**VWAP:** {latest['VWAP']:.2f}")
 st.write(f"**Volume:** {int(latest['Volume'])} | Avg Volume: {int(latest['Volume_SMA20'])}")
-st.write(f"**Signal:** {'🟢 ' + latest['Signal'] if latest['Signal'] else 'No strong signal'}")
-
-# Candlestick + Signal Chart
-fig = go.Figure()
-fig.add_trace(go.Candlestick(x=df.index, open=df["Open"], high=df["High"],
-                             low=df["Low"], close=df["Close"], name="Price"))
-fig.add_trace(go.Scatter(x=df.index, y=df["EMA9"], name="EMA9", line=dict(width=1)))
-fig.add_trace(go.Scatter(x=df.index, y=df["EMA21"], name="EMA21", line=dict(width=1)))
-fig.add_trace(go.Scatter(x=df.index, y=df["VWAP"], name="VWAP", line=dict(width=1, dash="dot")))
-
-fig.add_trace(go.Scatter(x=df[df["Signal"] == "BUY"].index,
-                         y=df[df["Signal"] == "BUY"]["Close"],
-                         mode="markers", marker=dict(color="green", size=8),
-                         name="BUY"))
-
-fig.add_trace(go.Scatter(x=df[df["Signal"] == "SELL"].index,
-                         y=df[df["Signal"] == "SELL"]["Close"],
-                         mode="markers", marker=dict(color="red", size=8),
-                         name="SELL"))
-
-fig.update_layout(title=f"{ticker} Price + VWAP + Signals", xaxis_title="Time", yaxis_title="Price", height=600)
+signal_label = SIGNAL_LABELS[df["Signal"].iloc[-1]]
+st.write(f"**Signal:** {'🟢 ' + signal_label if signal_label else 'No strong signal'}")
+
+# Charts
+@st.cache_resource(ttl=max(CACHE_TTL.values()), show_spinner=False)
+def build_charts(_data, ticker, interval, period, refresh_key):
+    plot_df = to_plot(_data)
+
+    # BUY/SELL markers stay at full resolution; filter once and reuse for x and y
+    buy_mask = _data["Signal"].to_numpy() == 1
+    sell_mask = _data["Signal"].to_numpy() == -1
+    close_values = _data["Close"].to_numpy()
+
+    # Candlestick + Signal Chart
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(x=plot_df.index, open=plot_df["Open"], high=plot_df["High"],
+                                 low=plot_df["Low"], close=plot_df["Close"], name="Price"))
+    fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["EMA9"], name="EMA9", line=dict(width=1)))
+    fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["EMA21"], name="EMA21", line=dict(width=1)))
+    fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["VWAP"], name="VWAP", line=dict(width=1, dash="dot")))
+
+    fig.add_trace(go.Scatter(x=_data.index[buy_mask],
+                             y=close_values[buy_mask],
+                             mode="markers", marker=dict(color="green", size=8),
+                             name="BUY"))
+
+    fig.add_trace(go.Scatter(x=_data.index[sell_mask],
+                             y=close_values[sell_mask],
+                             mode="markers", marker=dict(color="red", size=8),
+                             name="SELL"))
+
+    fig.update_layout(title=f"{ticker} Price + VWAP + Signals", xaxis_title="Time", yaxis_title="Price", height=600)
+
+    # Volume Chart
+    vol_fig = go.Figure()
+    vol_fig.add_trace(go.Bar(x=plot_df.index, y=plot_df["Volume"], name="Volume"))
+    vol_fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["Volume_SMA20"], name="Avg Volume", line=dict(color="orange")))
+    vol_fig.update_layout(title=f"{ticker} Volume with Spikes", height=300)
+    return fig, vol_fig
+
+fig, vol_fig = build_charts(df, ticker, interval, period, refresh_key)
 st.plotly_chart(fig, use_container_width=True)
-
-# Volume Chart
-vol_fig = go.Figure()
-vol_fig.add_trace(go.Bar(x=df.index, y=df["Volume"], name="Volume"))
-vol_fig.add_trace(go.Scatter(x=df.index, y=df["Volume_SMA20"], name="Avg Volume", line=dict(color="orange")))
-vol_fig.update_layout(title=f"{ticker} Volume with Spikes", height=300)
 st.plotly_chart(vol_fig, use_container_width=True)
@@ -0,0 +1,191 @@
+# Numba kernels shared by the dashboards. Arrays are float32 to halve memory traffic; the running
+# sums and EMA states are float64 scalars, so accumulated error stays at float64 levels
+import numpy as np
+import pandas as pd
+from numba import njit
+
+
+@njit(cache=True, fastmath=True)
+def emas_macd(close):
+    # Same recurrences as ta's EMA/MACD (ewm adjust=False, min_periods=window), fused into one pass
+    n = len(close)
+    ema9 = np.empty_like(close)
+    ema21 = np.empty_like(close)
+    macd = np.empty_like(close)
+    macd_signal = np.empty_like(close)
+    a9, a12, a21, a26 = 2.0 / 10.0, 2.0 / 13.0, 2.0 / 22.0, 2.0 / 27.0
+    e9 = e12 = e21 = e26 = sig = 0.0
+    for i in range(n):
+        c = close[i]
+        if i == 0:
+            e9 = e12 = e21 = e26 = c
+        else:
+            e9 += a9 * (c - e9)
+            e12 += a12 * (c - e12)
+            e21 += a21 * (c - e21)
+            e26 += a26 * (c - e26)
+        m = e12 - e26
+        if i == 25:
+            sig = m
+        elif i > 25:
+            sig += a9 * (m - sig)
+        ema9[i] = e9 if i >= 8 else np.nan
+        ema21[i] = e21 if i >= 20 else np.nan
+        macd[i] = m if i >= 25 else np.nan
+        macd_signal[i] = sig if i >= 33 else np.nan
+    return ema9, ema21, macd, macd_signal
+
+
+@njit(cache=True, fastmath=True)
+def rsi14(close):
+    # Wilder smoothing (alpha = 1/14) of gains and losses in one pass, matching ta's RSIIndicator
+    n = len(close)
+    out = np.empty_like(close)
+    alpha = 1.0 / 14.0
+    avg_gain = avg_loss = 0.0
+    for i in range(n):
+        if i > 0:
+            delta = close[i] - close[i - 1]
+            avg_gain += alpha * ((delta if delta > 0 else 0.0) - avg_gain)
+            avg_loss += alpha * ((-delta if delta < 0 else 0.0) - avg_loss)
+        if i < 13:
+            out[i] = np.nan
+        elif avg_loss == 0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def vwap(high, low, close, volume):
+    # Cumulative typical-price * volume over cumulative volume; NaN until some volume has traded
+    n = len(close)
+    out = np.empty_like(close)
+    cum_pv = cum_v = 0.0
+    for i in range(n):
+        cum_pv += (high[i] + low[i] + close[i]) / 3.0 * volume[i]
+        cum_v += volume[i]
+        out[i] = cum_pv / cum_v if cum_v > 0 else np.nan
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def sma(values, window):
+    # Running sum: add the newest value, drop the one leaving the window; NaN until the window fills
+    n = len(values)
+    out = np.empty_like(values)
+    total = 0.0
+    for i in range(n):
+        total += values[i]
+        if i >= window:
+            total -= values[i - window]
+        out[i] = total / window if i >= window - 1 else np.nan
+    return out
+
+
+@njit(cache=True)
+def label_rsi_signals(rsi, macd, macd_signal, ema9, ema21):
+    # 1 = BUY, -1 = SELL, 0 = no signal; RSI extremes confirmed by MACD and EMA crossovers
+    out = np.zeros(len(rsi), dtype=np.int8)
+    for i in range(len(rsi)):
+        if rsi[i] < 30 and macd[i] > macd_signal[i] and ema9[i] > ema21[i]:
+            out[i] = 1
+        elif rsi[i] > 70 and macd[i] < macd_signal[i] and ema9[i] < ema21[i]:
+            out[i] = -1
+    return out
+
+
+@njit(cache=True)
+def label_vwap_signals(close, vwap, macd, macd_signal, ema9, ema21, volume_spike, allow_buy, allow_sell):
+    # 1 = BUY, -1 = SELL, 0 = no signal; MACD/EMA/VWAP agreement on a volume spike.
+    # allow_buy / allow_sell gate each side, e.g. on proximity to support or resistance
+    out = np.zeros(len(close), dtype=np.int8)
+    for i in range(len(close)):
+        if not volume_spike[i]:
+            continue
+        if allow_buy and macd[i] > macd_signal[i] and ema9[i] > ema21[i] and close[i] > vwap[i]:
+            out[i] = 1
+        elif allow_sell and macd[i] < macd_signal[i] and ema9[i] < ema21[i] and close[i] < vwap[i]:
+            out[i] = -1
+    return out
+
+
+@njit(cache=True)
+def match_trades(signal):
+    # Enter on a BUY while flat, exit on the next SELL; returns entry and exit bar positions
+    entries = np.empty(len(signal), dtype=np.int64)
+    exits = np.empty(len(signal), dtype=np.int64)
+    n_trades = 0
+    in_trade = False
+    for i in range(1, len(signal)):
+        if signal[i] == 1 and not in_trade:
+            entries[n_trades] = i
+            in_trade = True
+        elif in_trade and signal[i] == -1:
+            exits[n_trades] = i
+            n_trades += 1
+            in_trade = False
+    return entries[:n_trades], exits[:n_trades]
+
+
+# Prefer the ahead-of-time build from build_ext.py when it exists; it needs no JIT compile on import.
+# AOT exports do no type checking and crash the process on any other dtype, so the wrappers coerce first.
+# The module name carries the array dtype and float_bits() confirms it, so a build with other
+# signatures (e.g. an older float64 `tafast`) is never called; it falls back to the JIT kernels
+try:
+    import tafast_f4 as tafast
+    if tafast.float_bits() != 32:
+        tafast = None
+except (ImportError, AttributeError):
+    tafast = None
+
+
+def _f4(values):
+    return np.ascontiguousarray(values, dtype=np.float32)
+
+
+if tafast is not None:
+    def emas_macd(close):
+        return tafast.emas_macd(_f4(close))
+
+    def rsi14(close):
+        return tafast.rsi14(_f4(close))
+
+    def vwap(high, low, close, volume):
+        return tafast.vwap(_f4(high), _f4(low), _f4(close), _f4(volume))
+
+    def sma(values, window):
+        return tafast.sma(_f4(values), int(window))
+
+
+# Indicator columns for an OHLCV frame, on the same index; these call whichever kernels were picked above
+def compute_indicators(data):
+    # EMA/MACD, VWAP and volume spikes for the VWAP dashboards
+    close = data["Close"].to_numpy(dtype=np.float32)
+    volume = data["Volume"].to_numpy(dtype=np.float32)
+    ema9, ema21, macd, macd_signal = emas_macd(close)
+    vwap_values = vwap(data["High"].to_numpy(dtype=np.float32), data["Low"].to_numpy(dtype=np.float32), close, volume)
+    volume_sma20 = sma(volume, 20)
+    return pd.DataFrame({
+        "EMA9": ema9,
+        "EMA21": ema21,
+        "MACD": macd,
+        "MACD_Signal": macd_signal,
+        "VWAP": vwap_values,
+        "Volume_SMA20": volume_sma20,
+        "Volume_Spike": volume > 1.5 * volume_sma20,
+    }, index=data.index)
+
+
+def compute_rsi_indicators(data):
+    # RSI and EMA/MACD for the RSI dashboard
+    close = data["Close"].to_numpy(dtype=np.float32)
+    ema9, ema21, macd, macd_signal = emas_macd(close)
+    return pd.DataFrame({
+        "RSI": rsi14(close),
+        "EMA9": ema9,
+        "EMA21": ema21,
+        "MACD": macd,
+        "MACD_Signal": macd_signal,
+    }, index=data.index)
@@ -0,0 +1,32 @@
+# Cached OHLCV downloads shared by the dashboards
+import time
+
+import pandas as pd
+import streamlit as st
+import yfinance as yf
+
+from indicators import compute_indicators, compute_rsi_indicators
+
+# Seconds a download stays fresh, per bar interval. Reruns inside the refresh window reuse the
+# cached frame, indicators included, instead of hitting Yahoo again
+CACHE_TTL = {"1m": 30, "5m": 60, "15m": 120, "30m": 180, "1h": 300, "1d": 300}
+
+
+def current_refresh_key(interval):
+    # (ticker, interval, period, refresh_key) determines the frame, so caches of results derived from it
+    # (levels, charts) key on those and take the frame itself unhashed rather than re-hashing it each rerun
+    return int(time.time() // CACHE_TTL[interval])
+
+
+@st.cache_data(ttl=max(CACHE_TTL.values()), show_spinner=False)
+def load_ohlcv(ticker, interval, period, refresh_key, rsi=False):
+    # OHLCV joined with its indicator columns; rsi=True selects the RSI set instead of VWAP/volume
+    data = yf.download(ticker, interval=interval, period=period)
+
+    # Flatten columns if needed
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(0)
+
+    data = data.dropna()
+    indicators = compute_rsi_indicators(data) if rsi else compute_indicators(data)
+    return pd.concat([data, indicators], axis=1)
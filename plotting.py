@@ -0,0 +1,16 @@
+# Chart helpers shared by the dashboards
+import numpy as np
+
+# Bucket consecutive bars so long intraday histories stay under max_points on the chart;
+# Volume_SMA20 is summed like Volume so the average line stays on the same scale as the bars
+PLOT_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum", "Volume_SMA20": "sum"}
+
+
+def to_plot(data, max_points=2000):
+    step = -(-len(data) // max_points)
+    if step <= 1:
+        return data
+    agg = {col: PLOT_AGG.get(col, "last") for col in data.columns if col != "Signal"}
+    plot_data = data.groupby(np.arange(len(data)) // step).agg(agg)
+    plot_data.index = data.index[::step]
+    return plot_data